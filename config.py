@@ -1,16 +1,40 @@
-from pydantic_settings import BaseSettings
+from typing import List
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
-    # 数据库配置
-    DB_HOST: str = "mysql-10fed60c-project-manonghezuoshe.g.aivencloud.com"
-    DB_PORT: int = 23966
-    DB_USER: str = "avnadmin"
-    DB_PASSWORD: str = ""  # 请填写实际密码
+    """应用配置：从环境变量读取（本地调试时也会加载.env文件），缺少必填项时启动即报错"""
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=True, extra="ignore")
+
+    # 数据库配置（Vercel部署时通过环境变量注入）
+    DB_HOST: str
+    DB_PORT: int
+    DB_USER: str
+    DB_PASSWORD: str
     DB_NAME: str = "defaultdb"
+
+    # Redis缓存配置（可选，为空时只使用进程内缓存）
+    REDIS_URL: str = ""
+
+    # CORS允许的前端域名，多个用英文逗号分隔（不使用"*"，浏览器才能缓存预检结果）
+    ALLOWED_ORIGINS: str = "http://localhost:5173,http://localhost:3000,http://localhost:8080"
     
     # API配置
     API_TITLE: str = "股票数据查询API"
     API_VERSION: str = "1.0.0"
-    API_DESCRIPTION: str = "基于FastAPI的股票数据查询接口服务"
+    API_DESCRIPTION: str = """
+    基于FastAPI的股票数据查询接口服务，支持：
+    1. 按行业/地域分页查询股票
+    2. 按页码或游标（id）查询全量股票列表
+    3. 通过股票代码/唯一代码/名称查询单只股票
+    4. 获取单只股票最近7天日线数据
+    5. 获取股票最新技术指标
+    6. 获取Top3预测股票数据
+    7. 获取当天股票预测数据
+    """
+
+    @property
+    def allowed_origin_list(self) -> List[str]:
+        """将ALLOWED_ORIGINS解析为域名列表"""
+        return [origin.strip() for origin in self.ALLOWED_ORIGINS.split(",") if origin.strip()]
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
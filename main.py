@@ -2,42 +2,40 @@
 股票数据查询API - FastAPI主入口
 兼容本地运行 + Vercel Serverless部署
 """
-from fastapi import FastAPI, HTTPException, Path
+from fastapi import Depends, FastAPI, HTTPException, Path, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware  # 新增这行
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import SQLAlchemyError
 from typing import List, Dict, Optional
-from pydantic_settings import BaseSettings
+from contextlib import asynccontextmanager
+from datetime import datetime
+import hashlib
+import httpx
 import os
+import socket
 import sys
 
-# 解决Vercel部署时的模块导入问题（确保能找到stock_data_query）
+# 解决Vercel部署时的模块导入问题（确保能找到config和stock_data_query）
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from stock_data_query import StockQuery
-
-# ==================== 配置类（从环境变量读取，避免硬编码） ====================
-class Settings(BaseSettings):
-    # 数据库连接配置（Vercel部署时通过环境变量注入）
-    DB_HOST: str = os.getenv("DB_HOST", "")
-    DB_PORT: int = int(os.getenv("DB_PORT", 0))
-    DB_USER: str = os.getenv("DB_USER", "")
-    DB_PASSWORD: str = os.getenv("DB_PASSWORD", "")
-    DB_NAME: str = os.getenv("DB_NAME", "defaultdb")
-
-    # API元信息
-    API_TITLE: str = "股票数据查询API"
-    API_VERSION: str = "1.0.0"
-    API_DESCRIPTION: str = """
-    基于FastAPI的股票数据查询接口服务，支持：
-    1. 按行业/地域分页查询股票
-    2. 按页码查询全量股票列表
-    3. 通过股票代码/名称查询单只股票
-    4. 获取单只股票最近7天日线数据
-    5. 获取股票最新技术指标
-    6. 获取Top3预测股票数据
-    7. 获取当天股票预测数据
-    """
-
-# 初始化配置
-settings = Settings()
+from config import settings
+from stock_data_query import MAX_PAGE_NUMBER, QueryParamError, StockQuery, serialize_result
+
+# ==================== 应用生命周期（启动预热 / 关闭释放） ====================
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """启动时预热数据库连接和热点数据，把首个请求的握手和缓存未命中提前；关闭时释放连接"""
+    if stock_query:
+        try:
+            await stock_query.ping()
+            # 预先加载Top3预测数据写入缓存，首个请求直接命中
+            await stock_query.get_top3_predictions()
+            print("✅ 数据库连接预热完成")
+        except Exception as e:
+            print(f"⚠️  启动预热失败（不影响后续请求）: {str(e)}")
+    yield
+    await http_client.aclose()
+    if stock_query:
+        await stock_query.close()
 
 # ==================== FastAPI应用初始化 ====================
 app = FastAPI(
@@ -45,52 +43,81 @@ app = FastAPI(
     version=settings.API_VERSION,
     description=settings.API_DESCRIPTION,
     docs_url="/docs",  # Swagger文档地址
-    redoc_url="/redoc"  # ReDoc文档地址
+    redoc_url="/redoc",  # ReDoc文档地址
+    lifespan=lifespan  # 启动预热 / 关闭释放连接
 )
 
 # ==================== CORS 配置（新增部分）====================
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[
-        "http://localhost:5173",  # Vue 3 Vite 默认端口
-        "http://localhost:3000",  # Create React App 默认端口
-        "http://localhost:8080",  # Vue CLI 默认端口
-        "*"  # 开发阶段允许所有，生产环境建议指定具体域名
-    ],
+    allow_origins=settings.allowed_origin_list,  # 通过ALLOWED_ORIGINS环境变量配置
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "HEAD"],
     allow_headers=["*"],
-    expose_headers=["*"],
-    max_age=600,  # 预检请求缓存时间（秒）
+    expose_headers=["X-Next-Cursor", "X-Total-Count"],  # 游标分页的下一页游标、页码分页的总记录数
+    max_age=86400,  # 预检请求缓存时间（秒），浏览器会按自身上限截断
 )
 
 # ==================== 数据库连接初始化（容错处理） ====================
 stock_query: Optional[StockQuery] = None
 try:
-    # 仅当所有数据库配置都存在时初始化
-    if all([settings.DB_HOST, settings.DB_PORT, settings.DB_USER, settings.DB_PASSWORD, settings.DB_NAME]):
-        stock_query = StockQuery(
-            host=settings.DB_HOST,
-            port=settings.DB_PORT,
-            user=settings.DB_USER,
-            password=settings.DB_PASSWORD,
-            database=settings.DB_NAME
-        )
-        print("✅ 数据库连接初始化成功")
-    else:
-        print("⚠️  数据库配置不完整，跳过初始化（仅本地调试时生效）")
+    stock_query = StockQuery(
+        host=settings.DB_HOST,
+        port=settings.DB_PORT,
+        user=settings.DB_USER,
+        password=settings.DB_PASSWORD,
+        database=settings.DB_NAME,
+        redis_url=settings.REDIS_URL or None
+    )
+    print("✅ 数据库连接初始化成功")
 except Exception as e:
     print(f"❌ 数据库连接初始化失败: {str(e)}")
     stock_query = None
 
-# ==================== 通用依赖校验（装饰器替代，简化代码） ====================
-def check_db_connection():
-    """检查数据库连接是否可用"""
+# ==================== 全局异常处理（替代每个接口里重复的try/except） ====================
+@app.exception_handler(QueryParamError)
+async def query_param_error_handler(request: Request, exc: QueryParamError):
+    """参数校验失败（如页码越界）统一返回400；其他ValueError按服务端错误处理，不暴露内部信息"""
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+@app.exception_handler(SQLAlchemyError)
+async def sqlalchemy_error_handler(request: Request, exc: SQLAlchemyError):
+    """数据库查询失败统一返回500"""
+    return JSONResponse(status_code=500, content={"detail": f"查询失败: {str(exc)}"})
+
+# ==================== 通用依赖校验 ====================
+def check_db_connection() -> StockQuery:
+    """检查数据库连接是否可用，可用时返回查询器（作为接口依赖注入）"""
     if not stock_query:
         raise HTTPException(
             status_code=500,
             detail="数据库连接未初始化，请检查环境变量配置或数据库服务状态"
         )
+    return stock_query
+
+# ==================== HTTP缓存（Cache-Control / ETag） ====================
+# 股票基础数据日内基本不变，预测数据刷新较快
+STOCK_CACHE_MAX_AGE = 3600
+PREDICTION_CACHE_MAX_AGE = 60
+
+def with_http_cache(request: Request, response: Response, data, max_age: int):
+    """为可缓存的查询结果设置Cache-Control和弱ETag；客户端缓存的ETag仍有效时直接返回304"""
+    # 按Redis缓存的序列化形式计算，数据库结果（Decimal）和Redis结果（字符串）得到相同的ETag
+    body = serialize_result(data)
+    etag = f'W/"{hashlib.md5(body.encode("utf-8")).hexdigest()}"'
+    headers = {
+        "Cache-Control": f"public, max-age={max_age}, stale-while-revalidate=60",
+        "ETag": etag,
+    }
+
+    # If-None-Match可能包含多个ETag，按弱比较（忽略W/前缀）匹配
+    if_none_match = request.headers.get("if-none-match", "")
+    client_etags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    if "*" in client_etags or etag.removeprefix("W/") in client_etags:
+        return Response(status_code=304, headers={**response.headers, **headers})
+
+    response.headers.update(headers)
+    return data
 
 # ==================== 核心接口定义 ====================
 @app.get("/", summary="健康检查", tags=["基础功能"])
@@ -107,163 +134,217 @@ def health_check():
          response_model=List[Dict], 
          summary="按页码查询全量股票列表",
          tags=["股票列表查询"])
-def get_stocks_by_page(
-    page_num: int = Path(..., ge=1, description="页码，从1开始")
+async def get_stocks_by_page(
+    request: Request,
+    response: Response,
+    page_num: int = Path(..., ge=1, le=MAX_PAGE_NUMBER, description=f"页码，从1开始，最大{MAX_PAGE_NUMBER}"),
+    query: StockQuery = Depends(check_db_connection)
 ):
-    """获取全量股票的第n页数据（每页20条）"""
-    check_db_connection()
-    try:
-        return stock_query.get_stocks_by_page_number(page_num)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"查询失败: {str(e)}")
+    """获取全量股票的第n页数据（每页20条，总记录数见响应头X-Total-Count）"""
+    result, total = await query.get_stocks_by_page_number(page_num)
+    response.headers["X-Total-Count"] = str(total)
+    return with_http_cache(request, response, result, STOCK_CACHE_MAX_AGE)
 
 # 新增：通过股票代码查询单只股票
 @app.get("/stocks/symbol/{symbol}", 
          response_model=Optional[Dict], 
          summary="通过股票代码查询股票",
          tags=["单只股票数据"])
-def get_stock_by_symbol(
-    symbol: str = Path(..., description="股票代码，如：1")
+async def get_stock_by_symbol(
+    request: Request,
+    response: Response,
+    symbol: str = Path(..., description="股票代码，如：1"),
+    query: StockQuery = Depends(check_db_connection)
 ):
     """通过股票代码查询单只股票详情"""
-    check_db_connection()
-    try:
-        result = stock_query.get_stock_by_symbol(symbol)
-        if not result:
-            raise HTTPException(status_code=404, detail=f"未找到代码为{symbol}的股票")
-        return result
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"查询失败: {str(e)}")
+    result = await query.get_stock_by_symbol(symbol)
+    if not result:
+        raise HTTPException(status_code=404, detail=f"未找到代码为{symbol}的股票")
+    return with_http_cache(request, response, result, STOCK_CACHE_MAX_AGE)
 
 # 新增：通过股票名称查询单只股票
 @app.get("/stocks/name/{name}", 
          response_model=Optional[Dict], 
          summary="通过股票名称查询股票",
          tags=["单只股票数据"])
-def get_stock_by_name(
-    name: str = Path(..., description="股票名称，如：平安银行")
+async def get_stock_by_name(
+    request: Request,
+    response: Response,
+    name: str = Path(..., description="股票名称，如：平安银行"),
+    query: StockQuery = Depends(check_db_connection)
 ):
     """通过股票名称查询单只股票详情"""
-    check_db_connection()
-    try:
-        result = stock_query.get_stock_by_name(name)
-        if not result:
-            raise HTTPException(status_code=404, detail=f"未找到名称为{name}的股票")
-        return result
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"查询失败: {str(e)}")
+    result = await query.get_stock_by_name(name)
+    if not result:
+        raise HTTPException(status_code=404, detail=f"未找到名称为{name}的股票")
+    return with_http_cache(request, response, result, STOCK_CACHE_MAX_AGE)
+
+@app.get("/stocks/search/{value}", 
+         response_model=Optional[Dict], 
+         summary="按代码/唯一代码/名称搜索股票",
+         tags=["单只股票数据"])
+async def search_stock(
+    request: Request,
+    response: Response,
+    value: str = Path(..., description="股票代码、唯一代码或名称，如：1、000001.SZ、平安银行"),
+    query: StockQuery = Depends(check_db_connection)
+):
+    """一次查询同时匹配股票代码、唯一代码和名称，返回优先级最高的一只股票"""
+    result = await query.get_stock_any(value)
+    if not result:
+        raise HTTPException(status_code=404, detail=f"未找到与{value}匹配的股票")
+    return with_http_cache(request, response, result, STOCK_CACHE_MAX_AGE)
 
 @app.get("/stocks/industry/{industry}/page/{page_num}", 
          response_model=List[Dict], 
          summary="按行业分页查询股票",
          tags=["股票列表查询"])
-def get_stocks_by_industry(
+async def get_stocks_by_industry(
+    request: Request,
+    response: Response,
     industry: str = Path(..., description="行业名称，如：科技、金融、医药"),
-    page_num: int = Path(..., ge=1, description="页码，从1开始")
+    page_num: int = Path(..., ge=1, le=MAX_PAGE_NUMBER, description=f"页码，从1开始，最大{MAX_PAGE_NUMBER}"),
+    query: StockQuery = Depends(check_db_connection)
 ):
-    """获取指定行业的第n页股票数据（每页20条）"""
-    check_db_connection()
-    try:
-        return stock_query.get_stocks_by_page_and_industry(page_num, industry)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"查询失败: {str(e)}")
+    """获取指定行业的第n页股票数据（每页20条，总记录数见响应头X-Total-Count）"""
+    result, total = await query.get_stocks_by_page_and_industry(page_num, industry)
+    response.headers["X-Total-Count"] = str(total)
+    return with_http_cache(request, response, result, STOCK_CACHE_MAX_AGE)
 
 @app.get("/stocks/area/{area}/page/{page_num}", 
          response_model=List[Dict], 
          summary="按地域分页查询股票",
          tags=["股票列表查询"])
-def get_stocks_by_area(
+async def get_stocks_by_area(
+    request: Request,
+    response: Response,
     area: str = Path(..., description="地域名称，如：北京、上海、广东"),
-    page_num: int = Path(..., ge=1, description="页码，从1开始")
+    page_num: int = Path(..., ge=1, le=MAX_PAGE_NUMBER, description=f"页码，从1开始，最大{MAX_PAGE_NUMBER}"),
+    query: StockQuery = Depends(check_db_connection)
 ):
-    """获取指定地域的第n页股票数据（每页20条）"""
-    check_db_connection()
-    try:
-        return stock_query.get_stocks_by_page_and_area(page_num, area)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"查询失败: {str(e)}")
+    """获取指定地域的第n页股票数据（每页20条，总记录数见响应头X-Total-Count）"""
+    result, total = await query.get_stocks_by_page_and_area(page_num, area)
+    response.headers["X-Total-Count"] = str(total)
+    return with_http_cache(request, response, result, STOCK_CACHE_MAX_AGE)
+
+# ==================== 游标分页（keyset）接口 ====================
+def set_next_cursor(response: Response, rows: List[Dict], limit: int):
+    """结果满页时通过X-Next-Cursor响应头返回下一页游标（本页最后一条的id）"""
+    if len(rows) == limit:
+        response.headers["X-Next-Cursor"] = str(rows[-1]["id"])
+
+@app.get("/stocks/after/{last_id}", 
+         response_model=List[Dict], 
+         summary="游标分页查询全量股票列表",
+         tags=["股票列表查询"])
+async def get_stocks_after_id(
+    request: Request,
+    response: Response,
+    last_id: int = Path(..., ge=0, description="上一页最后一条的id，首页传0"),
+    limit: int = Query(20, ge=1, le=100, description="每页条数"),
+    query: StockQuery = Depends(check_db_connection)
+):
+    """获取id大于last_id的股票数据，下一页游标见响应头X-Next-Cursor"""
+    result = await query.get_stocks_after_id(last_id, limit)
+    set_next_cursor(response, result, limit)
+    return with_http_cache(request, response, result, STOCK_CACHE_MAX_AGE)
+
+@app.get("/stocks/industry/{industry}/after/{last_id}", 
+         response_model=List[Dict], 
+         summary="按行业游标分页查询股票",
+         tags=["股票列表查询"])
+async def get_stocks_by_industry_after_id(
+    request: Request,
+    response: Response,
+    industry: str = Path(..., description="行业名称，如：科技、金融、医药"),
+    last_id: int = Path(..., ge=0, description="上一页最后一条的id，首页传0"),
+    limit: int = Query(20, ge=1, le=100, description="每页条数"),
+    query: StockQuery = Depends(check_db_connection)
+):
+    """获取指定行业中id大于last_id的股票数据，下一页游标见响应头X-Next-Cursor"""
+    result = await query.get_stocks_by_industry_after_id(industry, last_id, limit)
+    set_next_cursor(response, result, limit)
+    return with_http_cache(request, response, result, STOCK_CACHE_MAX_AGE)
+
+@app.get("/stocks/area/{area}/after/{last_id}", 
+         response_model=List[Dict], 
+         summary="按地域游标分页查询股票",
+         tags=["股票列表查询"])
+async def get_stocks_by_area_after_id(
+    request: Request,
+    response: Response,
+    area: str = Path(..., description="地域名称，如：北京、上海、广东"),
+    last_id: int = Path(..., ge=0, description="上一页最后一条的id，首页传0"),
+    limit: int = Query(20, ge=1, le=100, description="每页条数"),
+    query: StockQuery = Depends(check_db_connection)
+):
+    """获取指定地域中id大于last_id的股票数据，下一页游标见响应头X-Next-Cursor"""
+    result = await query.get_stocks_by_area_after_id(area, last_id, limit)
+    set_next_cursor(response, result, limit)
+    return with_http_cache(request, response, result, STOCK_CACHE_MAX_AGE)
 
 @app.get("/stocks/{ts_code}/recent-7days", 
          response_model=List[Dict], 
          summary="获取股票最近7天日线数据",
          tags=["单只股票数据"])
-def get_recent_7_days_data(
-    ts_code: str = Path(..., description="股票唯一代码，如：000001.SZ、600000.SH")
+async def get_recent_7_days_data(
+    request: Request,
+    response: Response,
+    ts_code: str = Path(..., description="股票唯一代码，如：000001.SZ、600000.SH"),
+    query: StockQuery = Depends(check_db_connection)
 ):
-    """获取指定股票最近7个交易日的日线数据（跳过周末）"""
-    check_db_connection()
-    try:
-        result = stock_query.get_recent_7_days_data(ts_code)
-        if not result:
-            raise HTTPException(status_code=404, detail=f"未找到{ts_code}的最近7天数据")
-        return result
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"查询失败: {str(e)}")
+    """获取指定股票最近7个交易日的日线数据"""
+    result = await query.get_recent_7_days_data(ts_code)
+    if not result:
+        raise HTTPException(status_code=404, detail=f"未找到{ts_code}的最近7天数据")
+    return with_http_cache(request, response, result, STOCK_CACHE_MAX_AGE)
 
 @app.get("/stocks/{ts_code}/technical-indicators/latest", 
          response_model=Optional[Dict], 
          summary="获取股票最新技术指标",
          tags=["单只股票数据"])
-def get_latest_technical_indicators(
-    ts_code: str = Path(..., description="股票唯一代码，如：000001.SZ")
+async def get_latest_technical_indicators(
+    request: Request,
+    response: Response,
+    ts_code: str = Path(..., description="股票唯一代码，如：000001.SZ"),
+    query: StockQuery = Depends(check_db_connection)
 ):
-    """获取指定股票最新的技术指标数据（MACD、RSI、KDJ等）"""
-    check_db_connection()
-    try:
-        result = stock_query.get_latest_technical_indicators(ts_code)
-        if not result:
-            raise HTTPException(status_code=404, detail=f"未找到{ts_code}的技术指标数据")
-        return result
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"查询失败: {str(e)}")
+    """获取指定股票最新的技术指标数据（MA5/MA20、RSI、MACD、布林线）"""
+    result = await query.get_latest_technical_indicators(ts_code)
+    if not result:
+        raise HTTPException(status_code=404, detail=f"未找到{ts_code}的技术指标数据")
+    return with_http_cache(request, response, result, STOCK_CACHE_MAX_AGE)
 
 @app.get("/stocks/predictions/top3", 
          response_model=List[Dict], 
          summary="获取Top3预测股票数据",
          tags=["预测数据"])
-def get_top3_stock_predictions():
-    """获取ai_predictions_top3表中的三支股票预测数据（按ID升序）"""
-    check_db_connection()
-    try:
-        result = stock_query.get_top3_predictions()
-        if not result:
-            raise HTTPException(status_code=404, detail="ai_predictions_top3表中未找到数据")
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"查询失败: {str(e)}")
+async def get_top3_stock_predictions(
+    request: Request,
+    response: Response,
+    query: StockQuery = Depends(check_db_connection)
+):
+    """获取ai_predictions_top3表中的三支股票预测数据（按ID升序，附带股票名称、行业、地域）"""
+    result = await query.get_top3_predictions()
+    if not result:
+        raise HTTPException(status_code=404, detail="ai_predictions_top3表中未找到数据")
+    return with_http_cache(request, response, result, PREDICTION_CACHE_MAX_AGE)
 
 @app.get("/stocks/{ts_code}/predictions/latest", 
          response_model=List[Dict], 
          summary="获取股票最新预测数据",
          tags=["预测数据"])
-def get_latest_predictions(
-    ts_code: str = Path(..., description="股票唯一代码，如：000001.SZ")
+async def get_latest_predictions(
+    request: Request,
+    response: Response,
+    ts_code: str = Path(..., description="股票唯一代码，如：000001.SZ"),
+    query: StockQuery = Depends(check_db_connection)
 ):
     """获取指定股票最新的预测数据（优先今天，无则取最近日期）"""
-    check_db_connection()
-    try:
-        result = stock_query.get_latest_predictions_by_ts_code(ts_code)
-        if not result:
-            raise HTTPException(status_code=404, detail=f"未找到{ts_code}的预测数据")
-        return result
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"查询失败: {str(e)}")
+    result = await query.get_latest_predictions_by_ts_code(ts_code)
+    if not result:
+        raise HTTPException(status_code=404, detail=f"未找到{ts_code}的预测数据")
+    return with_http_cache(request, response, result, PREDICTION_CACHE_MAX_AGE)
     
 @app.get("/debug/env", summary="环境变量检查")
 def debug_env():
@@ -295,24 +376,40 @@ def debug_env():
             "PYTHONPATH": os.getenv("PYTHONPATH", "NOT_SET"),
         }
     }
+# 复用同一个HTTP客户端，避免每次请求都重新建立TCP/TLS连接
+http_client = httpx.AsyncClient(timeout=5)
+external_ip_info: Optional[Dict] = None
+
+async def lookup_external_ip() -> Dict:
+    """查询外部IP及地理位置（两次查询都成功后缓存，之后直接复用；失败时不缓存，下次请求重试）"""
+    global external_ip_info
+    if external_ip_info is not None:
+        return external_ip_info
+
+    ip_response = await http_client.get("https://api.ipify.org?format=json")
+    if not ip_response.is_success:
+        return {"external_ip": "unknown", "location": {}}
+    external_ip = ip_response.json()["ip"]
+
+    location_response = await http_client.get(f"https://ipapi.co/{external_ip}/json/")
+    if not location_response.is_success:
+        return {"external_ip": external_ip, "location": {}}
+
+    external_ip_info = {"external_ip": external_ip, "location": location_response.json()}
+    return external_ip_info
+
 @app.get("/debug/ip", summary="查看服务器IP")
-def debug_ip():
+async def debug_ip():
     """查看 Vercel 服务器的实际 IP"""
-    import socket
-    import requests
-    
     try:
         # 获取本机信息
         hostname = socket.gethostname()
         local_ip = socket.gethostbyname(hostname)
         
-        # 获取外部看到的IP
-        external_ip_response = requests.get("https://api.ipify.org?format=json", timeout=5)
-        external_ip = external_ip_response.json()["ip"] if external_ip_response.ok else "unknown"
-        
-        # 获取 IP 地理位置（可选）
-        location_response = requests.get(f"https://ipapi.co/{external_ip}/json/", timeout=5)
-        location = location_response.json() if location_response.ok else {}
+        # 获取外部看到的IP及地理位置（进程内缓存）
+        info = await lookup_external_ip()
+        external_ip = info["external_ip"]
+        location = info["location"]
         
         return {
             "server_info": {
@@ -333,16 +430,11 @@ def debug_ip():
         }
     except Exception as e:
         return {"error": str(e)}
+
 # ==================== 本地运行入口（Vercel部署时不会执行） ====================
 if __name__ == "__main__":
     import uvicorn
-    # 本地运行时优先加载.env文件（需安装python-dotenv）
-    try:
-        from dotenv import load_dotenv
-        load_dotenv()
-        print("✅ 加载.env文件成功（本地调试）")
-    except ImportError:
-        pass
+    # .env文件由config.Settings自动加载，这里无需再手动读取
 
     # 本地运行配置
     uvicorn.run(
@@ -0,0 +1,19 @@
+-- 为 stock_data_query.py 中的查询补充索引（需MySQL 8+，支持降序索引）
+-- 执行后可用 EXPLAIN 确认各查询为 type=ref 且不再出现 Using filesort
+
+-- 按地域/行业分页：WHERE area/industry = ? ORDER BY id
+CREATE INDEX ix_stocks_area_id ON stocks(area, id);
+CREATE INDEX ix_stocks_industry_id ON stocks(industry, id);
+
+-- 按股票代码/名称查询单只股票
+CREATE UNIQUE INDEX ix_stocks_symbol ON stocks(symbol);
+CREATE INDEX ix_stocks_name ON stocks(name);
+
+-- 最近日线数据：WHERE ts_code = ? ORDER BY trade_date DESC
+CREATE INDEX ix_daily_tscode_date ON stock_daily_data(ts_code, trade_date DESC);
+
+-- 最新技术指标：WHERE ts_code = ? ORDER BY id DESC
+CREATE INDEX ix_tech_tscode_id ON stock_technical_indicators_clean(ts_code, id DESC);
+
+-- 最新预测数据：WHERE ts_code = ? ORDER BY predict_date DESC, id DESC
+CREATE INDEX ix_pred_tscode_date ON ai_predictions(ts_code, predict_date DESC, id DESC);
@@ -0,0 +1,2 @@
+-- 按唯一代码查找股票（/stocks/search 及Top3预测与stocks的关联）
+CREATE UNIQUE INDEX ix_stocks_ts_code ON stocks(ts_code);
@@ -1,276 +1,503 @@
 """股票查询器"""
-from typing import List, Dict, Optional
-from sqlalchemy import create_engine, text
-from sqlalchemy.exc import SQLAlchemyError
+import asyncio
+import functools
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import List, Dict, Mapping, Optional, Tuple
+import redis.asyncio as aioredis
+from cachetools import TTLCache
+from cachetools.keys import hashkey
+from redis.exceptions import RedisError
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+# 进程内缓存：股票基础信息每天最多变动一次，预测数据刷新更频繁
+stocks_cache = TTLCache(maxsize=1024, ttl=3600)
+predictions_cache = TTLCache(maxsize=256, ttl=60)
+cache_stats = {"hits": 0, "misses": 0, "coalesced": 0}
+_MISSING = object()
+
+# 页码分页的上限（OFFSET最多约1万行），更深的数据请使用游标分页接口
+MAX_PAGE_NUMBER = 500
+
+
+# 预编译的SQL语句：模块加载时创建一次，每次调用复用同一对象
+_Q_PING = text("SELECT 1")
+_Q_COUNT = text("SELECT COUNT(*) as total FROM stocks")
+_Q_COUNT_BY_AREA = text("SELECT COUNT(*) as total FROM stocks WHERE area = :area")
+_Q_COUNT_BY_INDUSTRY = text("SELECT COUNT(*) as total FROM stocks WHERE industry = :industry")
+
+# 分页查询用窗口函数在同一次查询中带回总记录数（需MySQL 8+），供接口返回X-Total-Count
+_Q_PAGE = text("""
+    SELECT id, ts_code, symbol, name, area, industry, list_date,
+           COUNT(*) OVER () AS _total
+    FROM stocks
+    ORDER BY id ASC
+    LIMIT :limit OFFSET :offset
+""")
+
+_Q_BY_SYMBOL = text("""
+    SELECT id, ts_code, symbol, name, area, industry, list_date
+    FROM stocks
+    WHERE symbol = :symbol
+    LIMIT 1
+""")
+
+_Q_BY_NAME = text("""
+    SELECT id, ts_code, symbol, name, area, industry, list_date
+    FROM stocks
+    WHERE name = :name
+    LIMIT 1
+""")
+
+# 依次按代码、唯一代码、名称精确匹配，各分支都能走单列索引，取优先级最高的一条
+_Q_SEARCH = text("""
+    SELECT id, ts_code, symbol, name, area, industry, list_date
+    FROM (
+        (SELECT id, ts_code, symbol, name, area, industry, list_date, 1 AS priority
+         FROM stocks WHERE symbol = :value LIMIT 1)
+        UNION ALL
+        (SELECT id, ts_code, symbol, name, area, industry, list_date, 2 AS priority
+         FROM stocks WHERE ts_code = :value LIMIT 1)
+        UNION ALL
+        (SELECT id, ts_code, symbol, name, area, industry, list_date, 3 AS priority
+         FROM stocks WHERE name = :value LIMIT 1)
+    ) AS matches
+    ORDER BY priority
+    LIMIT 1
+""")
+
+_Q_PAGE_BY_AREA = text("""
+    SELECT id, ts_code, symbol, name, area, industry, list_date,
+           COUNT(*) OVER () AS _total
+    FROM stocks
+    WHERE area = :area
+    ORDER BY id ASC
+    LIMIT :limit OFFSET :offset
+""")
+
+_Q_PAGE_BY_INDUSTRY = text("""
+    SELECT id, ts_code, symbol, name, area, industry, list_date,
+           COUNT(*) OVER () AS _total
+    FROM stocks
+    WHERE industry = :industry
+    ORDER BY id ASC
+    LIMIT :limit OFFSET :offset
+""")
+
+_Q_AFTER_ID = text("""
+    SELECT id, ts_code, symbol, name, area, industry, list_date
+    FROM stocks
+    WHERE id > :last_id
+    ORDER BY id ASC
+    LIMIT :limit
+""")
+
+_Q_AFTER_ID_BY_AREA = text("""
+    SELECT id, ts_code, symbol, name, area, industry, list_date
+    FROM stocks
+    WHERE area = :area AND id > :last_id
+    ORDER BY id ASC
+    LIMIT :limit
+""")
+
+_Q_AFTER_ID_BY_INDUSTRY = text("""
+    SELECT id, ts_code, symbol, name, area, industry, list_date
+    FROM stocks
+    WHERE industry = :industry AND id > :last_id
+    ORDER BY id ASC
+    LIMIT :limit
+""")
+
+# 日线表只有交易日才有数据，直接取最近7条即可（走(ts_code, trade_date)索引）
+_Q_RECENT_7_DAYS = text("""
+    SELECT id, ts_code, trade_date, open, close, high, low, vol, amount
+    FROM stock_daily_data
+    WHERE ts_code = :ts_code
+    ORDER BY trade_date DESC
+    LIMIT 7
+""")
+
+_Q_LATEST_TECHNICAL_INDICATORS = text("""
+    SELECT id, ts_code, trade_date, ma5, ma20, rsi, macd, boll_upper, boll_lower
+    FROM stock_technical_indicators_clean
+    WHERE ts_code = :ts_code
+    ORDER BY id DESC
+    LIMIT 1
+""")
+
+_Q_LATEST_PREDICTION = text("""
+    SELECT id, ts_code, predict_date, for_date, prediction_score
+    FROM ai_predictions
+    WHERE ts_code = :ts_code
+    ORDER BY predict_date DESC, id DESC
+    LIMIT 1
+""")
+
+_Q_TOP3_PREDICTIONS = text("""
+    SELECT p.id, p.ts_code, p.predict_date, p.for_date, p.prediction_score,
+           s.name, s.industry, s.area
+    FROM ai_predictions_top3 p
+    LEFT JOIN stocks s ON s.ts_code = p.ts_code
+    ORDER BY p.id ASC
+""")
+
+
+class QueryParamError(ValueError):
+    """查询参数不合法（如页码越界、参数为空），调用方应按客户端错误（400）处理"""
+
+
+def _json_default(value):
+    """Redis序列化时处理查询行、日期和Decimal（与FastAPI的JSON输出保持一致）"""
+    if isinstance(value, Mapping):
+        return dict(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"无法序列化类型: {type(value).__name__}")
+
+
+def serialize_result(value) -> str:
+    """将查询结果序列化为JSON字符串（写入Redis与计算ETag共用，保证数据库结果和Redis结果序列化一致）"""
+    return json.dumps(value, default=_json_default, ensure_ascii=False)
+
+
+def _split_total(rows) -> Tuple[List[Dict], int]:
+    """拆出窗口函数附带的_total列，返回(去掉_total的记录列表, 总记录数)"""
+    if not rows:
+        return [], 0
+    total = rows[0]["_total"]
+    return [{k: v for k, v in row.items() if k != "_total"} for row in rows], total
+
+
+def _finish_inflight(inflight: Dict[tuple, asyncio.Task], key: tuple, task: asyncio.Task):
+    """查询Task结束后从inflight中移除，并读取异常（所有调用方都已取消时避免"exception was never retrieved"警告）"""
+    if inflight.get(key) is task:
+        del inflight[key]
+    if not task.cancelled():
+        task.exception()
+
+
+def _async_cached(cache: TTLCache, redis_ttl: int, daily: bool = False):
+    """协程方法的两级缓存装饰器（cachetools.cached不支持协程）
+
+    先查进程内TTL缓存，再查Redis（跨Vercel实例共享），都未命中才查数据库；
+    Redis不可用时直接回退到数据库。daily=True时把当天日期加入缓存键，跨天后自动失效。
+    同一参数的并发未命中只会有一个协程去查询，其余协程等待它的结果（singleflight）
+    """
+    def decorator(func):
+        async def load(self, key, args, kwargs):
+            """缓存未命中时依次查询Redis和数据库，并回写两级缓存"""
+            redis_key = "stock:" + ":".join(str(part) for part in key)
+            if self.redis is not None:
+                try:
+                    cached = await self.redis.get(redis_key)
+                    if cached is not None:
+                        value = json.loads(cached)
+                        cache[key] = value
+                        return value
+                except (RedisError, ValueError) as e:
+                    # ValueError覆盖JSON解码失败（值被截断或不是本服务写入的）
+                    print(f"⚠️  Redis读取失败，回退到数据库: {str(e)}")
+
+            value = await func(self, *args, **kwargs)
+            cache[key] = value
+
+            if self.redis is not None:
+                try:
+                    await self.redis.setex(redis_key, redis_ttl, serialize_result(value))
+                except RedisError as e:
+                    print(f"⚠️  Redis写入失败: {str(e)}")
+            return value
+
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            key = hashkey(func.__name__, *args, **kwargs)
+            if daily:
+                key += (date.today().isoformat(),)
+            value = cache.get(key, _MISSING)
+            if value is not _MISSING:
+                cache_stats["hits"] += 1
+                return value
+
+            # 同一数据的查询在独立的Task中执行，所有调用方（包括发起方）都通过shield等待，
+            # 任何一个请求被取消（如客户端断开）都不会取消共享的查询
+            task = self._inflight.get(key)
+            if task is None:
+                cache_stats["misses"] += 1
+                print(f"缓存未命中: {func.__name__}{args} "
+                      f"(命中{cache_stats['hits']}次/未命中{cache_stats['misses']}次/"
+                      f"合并{cache_stats['coalesced']}次)")
+                task = asyncio.create_task(load(self, key, args, kwargs))
+                self._inflight[key] = task
+                task.add_done_callback(functools.partial(_finish_inflight, self._inflight, key))
+            else:
+                cache_stats["coalesced"] += 1
+            return await asyncio.shield(task)
+        return wrapper
+    return decorator
+
 
 class StockQuery:
-    """股票查询器"""
+    """股票查询器
+
+    参数错误抛出QueryParamError，数据库错误直接抛出SQLAlchemyError，由调用方（main.py的全局异常处理）统一转换
+    """
     
-    def __init__(self, host: str, port: int, user: str, password: str, database: str):
-        """初始化数据库连接"""
-        self.connection_url = f"mysql+pymysql://{user}:{password}@{host}:{port}/{database}"
-        self.engine = create_engine(self.connection_url)
+    def __init__(self, host: str, port: int, user: str, password: str, database: str,
+                 redis_url: Optional[str] = None):
+        """初始化数据库连接（redis_url为空时只使用进程内缓存）"""
+        self.connection_url = f"mysql+aiomysql://{user}:{password}@{host}:{port}/{database}"
+        # 连接池：复用到远程MySQL的连接，避免每次请求都重新握手
+        self.engine = create_async_engine(
+            self.connection_url,
+            pool_size=10,
+            max_overflow=20,
+            pool_pre_ping=True,
+            pool_recycle=1800,
+            pool_timeout=30,
+        )
+        # Redis二级缓存：超时设置得较短，Redis故障时尽快回退到数据库
+        self.redis = None
+        if redis_url:
+            try:
+                self.redis = aioredis.from_url(
+                    redis_url,
+                    decode_responses=True,
+                    socket_connect_timeout=2,
+                    socket_timeout=2,
+                )
+            except (RedisError, ValueError) as e:
+                # REDIS_URL格式错误等情况不影响数据库查询，只是不启用Redis缓存
+                print(f"⚠️  Redis客户端初始化失败，仅使用进程内缓存: {str(e)}")
+        # 正在查询中的请求（缓存键 -> Task），用于合并并发的相同查询
+        self._inflight: Dict[tuple, asyncio.Task] = {}
+
+    async def ping(self):
+        """执行SELECT 1，提前建立连接池中的连接（启动预热用）"""
+        async with self.engine.connect() as conn:
+            await conn.execute(_Q_PING)
+
+    async def close(self):
+        """释放连接池和Redis连接"""
+        await self.engine.dispose()
+        if self.redis is not None:
+            await self.redis.aclose()
 
-    def get_stocks_by_page_number(self, n: int, check_total: bool = True) -> List[Dict]:
-        """获取第n页的股票数据（每页20条）"""
+    @_async_cached(stocks_cache, redis_ttl=86400)
+    async def get_stocks_by_page_number(self, n: int) -> Tuple[List[Dict], int]:
+        """获取第n页的股票数据（每页20条），返回(本页数据, 总记录数)"""
         if n < 1:
-            raise ValueError("页码n必须大于等于1")
-    
-        if check_total:
-            total_pages = self.get_total_pages()
-            if n > total_pages:
-                raise ValueError(f"页码{n}超过最大页数{total_pages}")
+            raise QueryParamError("页码n必须大于等于1")
+        if n > MAX_PAGE_NUMBER:
+            raise QueryParamError(f"页码{n}超过上限{MAX_PAGE_NUMBER}，更深的数据请使用游标分页接口")
     
         offset = 20 * (n - 1)
         limit = 20
     
-        query = text("""
-            SELECT id, ts_code, symbol, name, area, industry, list_date
-            FROM stocks
-            ORDER BY id ASC
-            LIMIT :limit OFFSET :offset
-        """)
+        async with self.engine.connect() as conn:
+            result = await conn.execute(_Q_PAGE, {"limit": limit, "offset": offset})
+            rows = result.mappings().all()
     
-        try:
-            with self.engine.connect() as conn:
-                result = conn.execute(query, {"limit": limit, "offset": offset})
-                rows = result.fetchall()
-            
-                if not rows and n > 1 and check_total:
-                    actual_total = self.get_total_records()
-                    if actual_total <= offset:
-                        raise ValueError(f"页码{n}超出数据范围，总记录数仅{actual_total}条")
-            
-                return [dict(row._mapping) for row in rows]
-                
-        except SQLAlchemyError as e:
-            raise Exception(f"数据库查询错误: {str(e)}")
+        # 页码越界时结果为空，拿不到窗口计数，此时才单独统计总数用于报错
+        if not rows and n > 1:
+            total_pages = await self.get_total_pages()
+            raise QueryParamError(f"页码{n}超过最大页数{total_pages}")
+    
+        return _split_total(rows)
 
-    def get_total_records(self) -> int:
+    async def get_total_records(self) -> int:
         """获取总记录数"""
-        try:
-            with self.engine.connect() as conn:
-                result = conn.execute(text("SELECT COUNT(*) as total FROM stocks"))
-                return result.fetchone().total
-        except SQLAlchemyError as e:
-            raise Exception(f"查询总记录数错误: {str(e)}")
-
-    def get_total_pages(self) -> int:
+        async with self.engine.connect() as conn:
+            result = await conn.execute(_Q_COUNT)
+            return result.fetchone().total
+
+    async def get_total_pages(self) -> int:
         """获取总页数"""
-        total_count = self.get_total_records()
+        total_count = await self.get_total_records()
         return (total_count + 20 - 1) // 20 if total_count > 0 else 0
 
-    def get_stock_by_symbol(self, symbol: str) -> Optional[Dict]:
+    @_async_cached(stocks_cache, redis_ttl=86400)
+    async def get_stock_by_symbol(self, symbol: str) -> Optional[Dict]:
         """通过股票代码查询股票"""
         if not symbol:
-            raise ValueError("股票代码不能为空")
+            raise QueryParamError("股票代码不能为空")
             
-        query = text("""
-            SELECT id, ts_code, symbol, name, area, industry, list_date
-            FROM stocks
-            WHERE symbol = :symbol
-            LIMIT 1
-        """)
-        
-        try:
-            with self.engine.connect() as conn:
-                result = conn.execute(query, {"symbol": symbol})
-                row = result.fetchone()
-                return dict(row._mapping) if row else None
-        except SQLAlchemyError as e:
-            raise Exception(f"查询错误: {str(e)}")
-
-    def get_stock_by_name(self, name: str) -> Optional[Dict]:
+        async with self.engine.connect() as conn:
+            result = await conn.execute(_Q_BY_SYMBOL, {"symbol": symbol})
+            return result.mappings().first()
+
+    @_async_cached(stocks_cache, redis_ttl=86400)
+    async def get_stock_by_name(self, name: str) -> Optional[Dict]:
         """通过股票名称查询股票"""
         if not name:
-            raise ValueError("股票名称不能为空")
+            raise QueryParamError("股票名称不能为空")
             
-        query = text("""
-            SELECT id, ts_code, symbol, name, area, industry, list_date
-            FROM stocks
-            WHERE name = :name
-            LIMIT 1
-        """)
-        
-        try:
-            with self.engine.connect() as conn:
-                result = conn.execute(query, {"name": name})
-                row = result.fetchone()
-                return dict(row._mapping) if row else None
-        except SQLAlchemyError as e:
-            raise Exception(f"查询错误: {str(e)}")
-
-    def get_stocks_by_page_and_area(self, n: int, area: str) -> List[Dict]:
-        """获取指定地域的第n页股票数据"""
+        async with self.engine.connect() as conn:
+            result = await conn.execute(_Q_BY_NAME, {"name": name})
+            return result.mappings().first()
+
+    @_async_cached(stocks_cache, redis_ttl=86400)
+    async def get_stock_any(self, value: str) -> Optional[Dict]:
+        """一次查询同时按股票代码、唯一代码、名称查找股票（优先级依次降低）"""
+        if not value:
+            raise QueryParamError("查询内容不能为空")
+            
+        async with self.engine.connect() as conn:
+            result = await conn.execute(_Q_SEARCH, {"value": value})
+            return result.mappings().first()
+
+    @_async_cached(stocks_cache, redis_ttl=86400)
+    async def get_stocks_by_page_and_area(self, n: int, area: str) -> Tuple[List[Dict], int]:
+        """获取指定地域的第n页股票数据，返回(本页数据, 该地域总记录数)"""
         if n < 1:
-            raise ValueError("页码n必须大于等于1")
+            raise QueryParamError("页码n必须大于等于1")
+        if n > MAX_PAGE_NUMBER:
+            raise QueryParamError(f"页码{n}超过上限{MAX_PAGE_NUMBER}，更深的数据请使用游标分页接口")
         if not area:
-            raise ValueError("地域参数不能为空")
-        
-        area_total = self.get_area_total_records(area)
-        if area_total == 0:
-            return []
-            
-        total_pages = self.get_area_total_pages(area)
-        if n > total_pages:
-            raise ValueError(f"页码{n}超过最大页数{total_pages}")
+            raise QueryParamError("地域参数不能为空")
         
         offset = 20 * (n - 1)
-        limit = 20 if n < total_pages else (area_total - offset)
+        limit = 20
+        
+        async with self.engine.connect() as conn:
+            result = await conn.execute(_Q_PAGE_BY_AREA, {"area": area, "limit": limit, "offset": offset})
+            rows = result.mappings().all()
         
-        query = text("""
-            SELECT id, ts_code, symbol, name, area, industry, list_date
-            FROM stocks
-            WHERE area = :area
-            ORDER BY id ASC
-            LIMIT :limit OFFSET :offset
-        """)
+        if not rows and n > 1:
+            total_pages = await self.get_area_total_pages(area)
+            if total_pages > 0:
+                raise QueryParamError(f"页码{n}超过最大页数{total_pages}")
         
-        try:
-            with self.engine.connect() as conn:
-                result = conn.execute(query, {"area": area, "limit": limit, "offset": offset})
-                return [dict(row._mapping) for row in result.fetchall()]
-        except SQLAlchemyError as e:
-            raise Exception(f"查询错误: {str(e)}")
-
-    def get_area_total_records(self, area: str) -> int:
+        return _split_total(rows)
+
+    async def get_area_total_records(self, area: str) -> int:
         """获取指定地域的总记录数"""
-        try:
-            with self.engine.connect() as conn:
-                result = conn.execute(
-                    text("SELECT COUNT(*) as total FROM stocks WHERE area = :area"),
-                    {"area": area}
-                )
-                return result.fetchone().total
-        except SQLAlchemyError as e:
-            raise Exception(f"查询错误: {str(e)}")
+        async with self.engine.connect() as conn:
+            result = await conn.execute(
+                _Q_COUNT_BY_AREA,
+                {"area": area}
+            )
+            return result.fetchone().total
 
-    def get_area_total_pages(self, area: str) -> int:
+    async def get_area_total_pages(self, area: str) -> int:
         """获取指定地域的总页数"""
-        total = self.get_area_total_records(area)
+        total = await self.get_area_total_records(area)
         return (total + 20 - 1) // 20 if total > 0 else 0
 
-    def get_stocks_by_page_and_industry(self, n: int, industry: str) -> List[Dict]:
-        """获取指定行业的第n页股票数据"""
+    @_async_cached(stocks_cache, redis_ttl=86400)
+    async def get_stocks_by_page_and_industry(self, n: int, industry: str) -> Tuple[List[Dict], int]:
+        """获取指定行业的第n页股票数据，返回(本页数据, 该行业总记录数)"""
         if n < 1:
-            raise ValueError("页码n必须大于等于1")
+            raise QueryParamError("页码n必须大于等于1")
+        if n > MAX_PAGE_NUMBER:
+            raise QueryParamError(f"页码{n}超过上限{MAX_PAGE_NUMBER}，更深的数据请使用游标分页接口")
         if not industry:
-            raise ValueError("行业参数不能为空")
-        
-        total = self.get_industry_total_records(industry)
-        if total == 0:
-            return []
-            
-        total_pages = self.get_industry_total_pages(industry)
-        if n > total_pages:
-            raise ValueError(f"页码{n}超过最大页数{total_pages}")
+            raise QueryParamError("行业参数不能为空")
         
         offset = 20 * (n - 1)
-        limit = 20 if n < total_pages else (total - offset)
+        limit = 20
+        
+        async with self.engine.connect() as conn:
+            result = await conn.execute(_Q_PAGE_BY_INDUSTRY, {"industry": industry, "limit": limit, "offset": offset})
+            rows = result.mappings().all()
         
-        query = text("""
-            SELECT id, ts_code, symbol, name, area, industry, list_date
-            FROM stocks
-            WHERE industry = :industry
-            ORDER BY id ASC
-            LIMIT :limit OFFSET :offset
-        """)
+        if not rows and n > 1:
+            total_pages = await self.get_industry_total_pages(industry)
+            if total_pages > 0:
+                raise QueryParamError(f"页码{n}超过最大页数{total_pages}")
         
-        try:
-            with self.engine.connect() as conn:
-                result = conn.execute(query, {"industry": industry, "limit": limit, "offset": offset})
-                return [dict(row._mapping) for row in result.fetchall()]
-        except SQLAlchemyError as e:
-            raise Exception(f"查询错误: {str(e)}")
-
-    def get_industry_total_records(self, industry: str) -> int:
+        return _split_total(rows)
+
+    async def get_industry_total_records(self, industry: str) -> int:
         """获取指定行业的总记录数"""
-        try:
-            with self.engine.connect() as conn:
-                result = conn.execute(
-                    text("SELECT COUNT(*) as total FROM stocks WHERE industry = :industry"),
-                    {"industry": industry}
-                )
-                return result.fetchone().total
-        except SQLAlchemyError as e:
-            raise Exception(f"查询错误: {str(e)}")
+        async with self.engine.connect() as conn:
+            result = await conn.execute(
+                _Q_COUNT_BY_INDUSTRY,
+                {"industry": industry}
+            )
+            return result.fetchone().total
 
-    def get_industry_total_pages(self, industry: str) -> int:
+    async def get_industry_total_pages(self, industry: str) -> int:
         """获取指定行业的总页数"""
-        total = self.get_industry_total_records(industry)
+        total = await self.get_industry_total_records(industry)
         return (total + 20 - 1) // 20 if total > 0 else 0
 
-    def get_recent_7_days_data(self, ts_code: str) -> List[Dict]:
-        """获取最近7个交易日的日线数据（跳过周末）"""
+    @_async_cached(stocks_cache, redis_ttl=86400)
+    async def get_stocks_after_id(self, last_id: int, limit: int = 20) -> List[Dict]:
+        """游标分页：获取id大于last_id的股票数据（按id升序，不受页码深度影响）"""
+        if last_id < 0:
+            raise QueryParamError("游标last_id必须大于等于0")
+        if not 1 <= limit <= 100:
+            raise QueryParamError("每页条数limit必须在1到100之间")
+        
+        async with self.engine.connect() as conn:
+            result = await conn.execute(_Q_AFTER_ID, {"last_id": last_id, "limit": limit})
+            return result.mappings().all()
+
+    @_async_cached(stocks_cache, redis_ttl=86400)
+    async def get_stocks_by_area_after_id(self, area: str, last_id: int, limit: int = 20) -> List[Dict]:
+        """游标分页：获取指定地域中id大于last_id的股票数据"""
+        if not area:
+            raise QueryParamError("地域参数不能为空")
+        if last_id < 0:
+            raise QueryParamError("游标last_id必须大于等于0")
+        if not 1 <= limit <= 100:
+            raise QueryParamError("每页条数limit必须在1到100之间")
+        
+        async with self.engine.connect() as conn:
+            result = await conn.execute(_Q_AFTER_ID_BY_AREA, {"area": area, "last_id": last_id, "limit": limit})
+            return result.mappings().all()
+
+    @_async_cached(stocks_cache, redis_ttl=86400)
+    async def get_stocks_by_industry_after_id(self, industry: str, last_id: int, limit: int = 20) -> List[Dict]:
+        """游标分页：获取指定行业中id大于last_id的股票数据"""
+        if not industry:
+            raise QueryParamError("行业参数不能为空")
+        if last_id < 0:
+            raise QueryParamError("游标last_id必须大于等于0")
+        if not 1 <= limit <= 100:
+            raise QueryParamError("每页条数limit必须在1到100之间")
+        
+        async with self.engine.connect() as conn:
+            result = await conn.execute(_Q_AFTER_ID_BY_INDUSTRY, {"industry": industry, "last_id": last_id, "limit": limit})
+            return result.mappings().all()
+
+    @_async_cached(stocks_cache, redis_ttl=86400, daily=True)
+    async def get_recent_7_days_data(self, ts_code: str) -> List[Dict]:
+        """获取最近7个交易日的日线数据"""
         if not ts_code:
-            raise ValueError("股票唯一代码不能为空")
+            raise QueryParamError("股票唯一代码不能为空")
             
-        query = text("""
-            SELECT * FROM stock_daily_data
-            WHERE ts_code = :ts_code
-              AND trade_date >= DATE_SUB(CURDATE(), INTERVAL 14 DAY)
-              AND WEEKDAY(trade_date) < 5
-            ORDER BY trade_date DESC
-            LIMIT 7
-        """)
-        
-        try:
-            with self.engine.connect() as conn:
-                result = conn.execute(query, {"ts_code": ts_code})
-                return [dict(row._mapping) for row in result.fetchall()]
-        except SQLAlchemyError as e:
-            raise Exception(f"查询错误: {str(e)}")
-
-    def get_latest_technical_indicators(self, ts_code: str) -> Optional[Dict]:
+        async with self.engine.connect() as conn:
+            result = await conn.execute(_Q_RECENT_7_DAYS, {"ts_code": ts_code})
+            return result.mappings().all()
+
+    @_async_cached(stocks_cache, redis_ttl=86400, daily=True)
+    async def get_latest_technical_indicators(self, ts_code: str) -> Optional[Dict]:
         """获取最新的技术指标"""
         if not ts_code:
-            raise ValueError("股票唯一代码不能为空")
+            raise QueryParamError("股票唯一代码不能为空")
             
-        query = text("""
-            SELECT * FROM stock_technical_indicators_clean
-            WHERE ts_code = :ts_code
-            ORDER BY id DESC
-            LIMIT 1
-        """)
-        
-        try:
-            with self.engine.connect() as conn:
-                result = conn.execute(query, {"ts_code": ts_code})
-                row = result.fetchone()
-                return dict(row._mapping) if row else None
-        except SQLAlchemyError as e:
-            raise Exception(f"查询错误: {str(e)}")
-
-    def get_latest_predictions_by_ts_code(self, ts_code: str) -> List[Dict]:
+        async with self.engine.connect() as conn:
+            result = await conn.execute(_Q_LATEST_TECHNICAL_INDICATORS, {"ts_code": ts_code})
+            return result.mappings().first()
+
+    @_async_cached(predictions_cache, redis_ttl=60, daily=True)
+    async def get_latest_predictions_by_ts_code(self, ts_code: str) -> List[Dict]:
         """获取指定股票最新的预测数据（优先今天，无则取最近）"""
         if not ts_code:
-            raise ValueError("股票唯一代码不能为空")
+            raise QueryParamError("股票唯一代码不能为空")
             
-        query = text("""
-            SELECT * FROM ai_predictions
-            WHERE ts_code = :ts_code
-            ORDER BY predict_date DESC, id DESC
-            LIMIT 1
-        """)
-        
-        try:
-            with self.engine.connect() as conn:
-                result = conn.execute(query, {"ts_code": ts_code})
-                rows = result.fetchall()
-                return [dict(row._mapping) for row in rows]
-        except SQLAlchemyError as e:
-            raise Exception(f"查询错误: {str(e)}")
-    def get_top3_predictions(self) -> List[Dict]:
-        """获取ai_predictions_top3表中的所有三支股票预测数据"""
-        query = text("""
-            SELECT id, ts_code, predict_date, for_date, prediction_score
-            FROM ai_predictions_top3
-            ORDER BY id ASC
-        """)
-        
-        try:
-            with self.engine.connect() as conn:
-                result = conn.execute(query)
-                return [dict(row._mapping) for row in result.fetchall()]
-        except SQLAlchemyError as e:
-            raise Exception(f"查询ai_predictions_top3错误: {str(e)}")
\ No newline at end of file
+        async with self.engine.connect() as conn:
+            result = await conn.execute(_Q_LATEST_PREDICTION, {"ts_code": ts_code})
+            return result.mappings().all()
+
+    @_async_cached(predictions_cache, redis_ttl=60)
+    async def get_top3_predictions(self) -> List[Dict]:
+        """获取ai_predictions_top3表中的所有三支股票预测数据（附带股票名称、行业、地域）"""
+        async with self.engine.connect() as conn:
+            result = await conn.execute(_Q_TOP3_PREDICTIONS)
+            return result.mappings().all()